@@ -0,0 +1,28 @@
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+
+# Each worker offloads processing to its own process pool; one process each keeps the total at one per core.
+# Set before stepcount.api is imported, which reads it.
+os.environ.setdefault("STEPCOUNT_PROCESS_WORKERS", "1")
+
+from stepcount.api import default_worker_count  # noqa: E402
+
+# One uvicorn worker per core, so that processing scales across cores, but no more than fit in
+# memory: each worker's processing process holds its own copy of the model, so memory use grows
+# by about STEPCOUNT_WORKER_MEMORY_MB (default 2048) per worker. Override with WEB_CONCURRENCY.
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", 0)) or default_worker_count()
+
+# Recycle workers periodically to bound memory growth from pandas/pytorch caches
+max_requests = 200
+max_requests_jitter = 40
+
+# Import the app once in the master so that it is shared copy-on-write by the workers
+preload_app = True
+
+
+def on_starting(server):
+    """Export the shared models once in the master, before any worker is forked"""
+    from stepcount.api import share_models
+    share_models()
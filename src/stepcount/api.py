@@ -1,27 +1,71 @@
 import os
-import io
+import sys
+import re
+import gc
+import ctypes
+import sqlite3
+import threading
+import asyncio
 import tempfile
 import json
+import hashlib
 import time
+import shutil
+import base64
+import itertools
+from types import MappingProxyType
+from functools import lru_cache
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, Mapping, NamedTuple, Tuple, Final
 import pandas as pd
 import numpy as np
+import joblib
+import orjson
+import blake3
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+import torch
+import matplotlib
+matplotlib.use('Agg')  # Render off-screen, the API has no display
 import matplotlib.pyplot as plt
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, BackgroundTasks
-from fastapi.responses import JSONResponse, FileResponse
+from numba import njit, prange, get_num_threads, set_num_threads
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, BackgroundTasks, Header
+from fastapi.responses import Response, JSONResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 import uvicorn
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
+
+# Not available on Windows, where concurrent model exports aren't serialized
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Optional, run the rf model's random forest with ONNX Runtime
+try:
+    import onnxruntime as ort
+    from skl2onnx import convert_sklearn, update_registered_converter
+    from skl2onnx.common.data_types import FloatTensorType
+    from skl2onnx.common.shape_calculator import calculate_linear_classifier_output_shapes
+    from skl2onnx.operator_converters.random_forest import convert_sklearn_random_forest_classifier
+    from imblearn.ensemble import BalancedRandomForestClassifier
+except ImportError:
+    ort = None
 
 from stepcount import __version__
 from stepcount import utils
-from stepcount.stepcount import load_model, summarize_enmo, summarize_steps, summarize_cadence, summarize_bouts, plot
+from stepcount.stepcount import load_model, summarize_enmo_both, summarize_steps_both, summarize_cadence_both, summarize_bouts, plot
 from stepcount import __model_version__
 
 
 # Pydantic models for request/response
 class ProcessingRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     model_type: str = "rf"
     sample_rate: Optional[int] = None
     txyz: str = "time,x,y,z"
@@ -41,6 +85,8 @@ class ProcessingRequest(BaseModel):
 
 
 class ProcessingResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     success: bool
     message: str
     processing_time: float
@@ -69,34 +115,389 @@ app.add_middleware(
 # Global model cache
 model_cache = {}
 
+# Directory holding decompressed copies of the models, which load much faster than the
+# LZMA originals. On disk rather than /dev/shm, which is only 64 MB in Docker by default.
+MODEL_SHARE_DIR = Path(os.environ.get(
+    "STEPCOUNT_MODEL_SHARE_DIR",
+    Path(tempfile.gettempdir()) / "stepcount-models"
+))
+
+# Models to decompress into MODEL_SHARE_DIR at startup, e.g. "rf,ssl"
+PRELOAD_MODELS = [m for m in os.environ.get("STEPCOUNT_PRELOAD_MODELS", "rf").split(",") if m]
+
+# Number of processes per API worker that run the CPU-bound processing
+PROCESS_WORKERS = int(os.environ.get("STEPCOUNT_PROCESS_WORKERS", os.cpu_count() or 1))
+
+# Memory budget of an API worker and its processing process, which holds its own copy of the
+# model (about 1.7 GB for rf)
+WORKER_MEMORY = int(os.environ.get("STEPCOUNT_WORKER_MEMORY_MB", 2048)) << 20
+
+
+def default_worker_count() -> int:
+    """One API worker per core, but only as many as fit in memory (the container's limit if any)"""
+    memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    for limit_path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            memory = min(memory, int(Path(limit_path).read_text()))
+            break
+        except (OSError, ValueError):
+            # No such cgroup, or "max" (unlimited)
+            pass
+    return max(1, min(os.cpu_count() or 1, memory // WORKER_MEMORY))
+
+# Opt-in: run the SSL model under bfloat16 (CPU) / float16 (CUDA) autocast. Off by default as
+# step counts haven't been checked against float32, and CPU bfloat16 is slower without AVX512-BF16.
+SSL_AUTOCAST = os.environ.get("STEPCOUNT_SSL_AUTOCAST", "0") == "1"
+
+# Run the rf model's random forest with ONNX Runtime when it is installed
+ONNX_RF = ort is not None and os.environ.get("STEPCOUNT_ONNX_RF", "1") == "1"
+
+# Size of the chunks used to stream uploaded files to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Directory and maximum number of entries of the processing results cache
+RESULTS_CACHE_DIR = Path(os.environ.get(
+    "STEPCOUNT_CACHE_DIR",
+    Path(tempfile.gettempdir()) / "stepcount-cache"
+))
+RESULTS_CACHE_MAX_ENTRIES = int(os.environ.get("STEPCOUNT_CACHE_MAX_ENTRIES", 256))
+
+# Directory keeping the output files of each cached result, evicted along with it
+OUTPUTS_DIR = Path(os.environ.get(
+    "STEPCOUNT_OUTPUT_DIR",
+    Path(tempfile.gettempdir()) / "stepcount-outputs"
+))
+
+MINUTE_NS = 60_000_000_000
+
+# Standard column names used during processing, also the default txyz
+STANDARD_COLUMNS = ('time', 'x', 'y', 'z')
+
+
+def get_model_path(model_type: str) -> Path:
+    return Path(__file__).parent / f"{__model_version__[model_type]}.joblib.lzma"
+
+
+def get_shared_model_path(model_type: str, mtime: int) -> Path:
+    return MODEL_SHARE_DIR / f"stepcount_{__model_version__[model_type]}_{mtime}.pkl"
+
+
+@contextmanager
+def model_share_lock(model_type: str):
+    """Hold an exclusive lock on a model's exports, so that only the first of the workers starting up exports it"""
+    MODEL_SHARE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(MODEL_SHARE_DIR / f"stepcount_{__model_version__[model_type]}.lock", 'wb') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def share_model(model_type: str):
+    """Decompress a model once into an uncompressed pickle that workers load instead of the LZMA original"""
+    model_path = get_model_path(model_type)
+    if model_path.exists() and get_shared_model_path(model_type, model_path.stat().st_mtime_ns).exists():
+        return
+
+    model = load_model(str(model_path), model_type, check_md5=True, force_download=False)
+    shared_path = get_shared_model_path(model_type, model_path.stat().st_mtime_ns)
+    # Write atomically so that a partial file is never loaded, and don't leave it behind (e.g. out of space)
+    tmp_path = shared_path.with_name(f"{shared_path.name}.{os.getpid()}.tmp")
+    try:
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, shared_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def get_onnx_classifier_path(model_type: str, mtime: int) -> Path:
+    return MODEL_SHARE_DIR / f"stepcount_{__model_version__[model_type]}_{mtime}.onnx"
+
+
+def share_onnx_classifier(model_type: str):
+    """Export the random forest of a shared model to ONNX once so that workers can run it with ONNX Runtime"""
+    mtime = get_model_path(model_type).stat().st_mtime_ns
+    onnx_path = get_onnx_classifier_path(model_type, mtime)
+    if onnx_path.exists():
+        return
+
+    clf = joblib.load(get_shared_model_path(model_type, mtime)).wd.clf
+    # BalancedRandomForestClassifier only differs from sklearn's random forest in how it is fitted
+    update_registered_converter(
+        BalancedRandomForestClassifier,
+        'ImbBalancedRandomForestClassifier',
+        calculate_linear_classifier_output_shapes,
+        convert_sklearn_random_forest_classifier,
+        options={
+            'zipmap': [True, False, 'columns'],
+            'nocl': [True, False],
+            'raw_scores': [True, False],
+            'decision_path': [True, False],
+            'decision_leaf': [True, False],
+        }
+    )
+    onx = convert_sklearn(
+        clf,
+        initial_types=[('X', FloatTensorType([None, clf.n_features_in_]))],
+        options={id(clf): {'zipmap': False}}
+    )
+    # Write atomically so that a partial file is never loaded
+    tmp_path = onnx_path.with_name(f"{onnx_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(onx.SerializeToString())
+        os.replace(tmp_path, onnx_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class OnnxClassifier:
+    """Stands in for the random forest's predict_proba, running the exported model with ONNX Runtime"""
+
+    def __init__(self, onnx_path: Path):
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Parallelism comes from the process pool
+        sess_options.intra_op_num_threads = 1
+        self.session = ort.InferenceSession(str(onnx_path), sess_options, providers=['CPUExecutionProvider'])
+
+    def predict_proba(self, X):
+        return self.session.run(['probabilities'], {'X': np.asarray(X, dtype=np.float32)})[0]
+
 
 def get_model(model_type: str, pytorch_device: str = "cpu"):
-    """Get or load model from cache"""
-    cache_key = f"{model_type}_{pytorch_device}"
+    """Get or load model from cache. The cache is keyed on the model file's mtime so that replaced models are reloaded."""
+    model_path = get_model_path(model_type)
+    mtime = model_path.stat().st_mtime_ns if model_path.exists() else None
+    cache_key = (model_type, pytorch_device, mtime)
     
     if cache_key not in model_cache:
-        model_path = Path(__file__).parent / f"{__model_version__[model_type]}.joblib.lzma"
-        model = load_model(str(model_path), model_type, check_md5=True, force_download=False)
+        shared_path = get_shared_model_path(model_type, mtime)
+        if mtime is not None and shared_path.exists():
+            # Skips the LZMA decompression. Not memory-mapped: scikit-learn copies the tree arrays when unpickling anyway.
+            model = joblib.load(shared_path)
+        else:
+            model = load_model(str(model_path), model_type, check_md5=True, force_download=False)
         model.wd.device = pytorch_device
+        if model_type == 'ssl':
+            # Build the network up front rather than lazily on the first prediction
+            model.wd.model = model.wd.load_model()
+            model.wd.model.eval()
+        if ONNX_RF and model_type == 'rf' and mtime is not None and get_onnx_classifier_path(model_type, mtime).exists():
+            model.wd.clf = OnnxClassifier(get_onnx_classifier_path(model_type, mtime))
+        # Drop models loaded from a previous version of the file
+        for key in [k for k in model_cache if k[:2] == cache_key[:2]]:
+            del model_cache[key]
         model_cache[cache_key] = model
     
     return model_cache[cache_key]
 
 
+def init_process_worker(model_types):
+    """Set up a process pool worker, loading models up front so that the first request doesn't pay for it"""
+    # Parallelism comes from the pool itself, avoid oversubscribing the cores with torch and numba threads
+    torch.set_num_threads(1)
+    set_num_threads(1)
+    for model_type in model_types:
+        try:
+            get_model(model_type)
+        except Exception as e:
+            # Preloading is only an optimization, and an exception here would break the whole pool.
+            # Requests retry the load and report the error.
+            print(f"Preloading the {model_type} model failed: {e}")
+
+
+def make_process_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=PROCESS_WORKERS,
+        initializer=init_process_worker,
+        initargs=(PRELOAD_MODELS,)
+    )
+
+
+async def run_in_process_pool(func, *args):
+    """Run a CPU-bound function in the process pool, replacing the pool if one of its processes died"""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(app.state.process_pool, func, *args)
+    except BrokenProcessPool:
+        app.state.process_pool = make_process_pool()
+        raise
+
+
+def get_results_cache_path(content_digest: str, request: ProcessingRequest) -> Path:
+    """
+    Cache entries are keyed on the uploaded file's content and the processing parameters,
+    as well as on everything that determines the results for them: the package and model
+    versions, the model file's mtime (replaced models) and the random forest backend.
+    """
+    model_version = __model_version__.get(request.model_type)
+    model_mtime = None
+    if model_version is not None:
+        model_path = get_model_path(request.model_type)
+        model_mtime = model_path.stat().st_mtime_ns if model_path.exists() else None
+    key = f"{__version__}|{model_version}|{model_mtime}|{ONNX_RF}|{request.model_dump_json()}"
+    request_digest = hashlib.md5(key.encode()).hexdigest()
+    return RESULTS_CACHE_DIR / f"{content_digest}_{request_digest}.json"
+
+
+def get_outputs_dir(cache_path: Path) -> Path:
+    """Directory of the output files of a cache entry"""
+    return OUTPUTS_DIR / cache_path.stem
+
+
+def load_cached_response(cache_path: Path) -> Optional[ProcessingResponse]:
+    try:
+        response = ProcessingResponse.model_validate_json(cache_path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    # Mark the entry as recently used. atime isn't reliable with relatime/noatime mounts so mtime is used.
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return response
+
+
+def store_cached_response(cache_path: Path, response: ProcessingResponse):
+    """Write a cache entry atomically and evict the least recently used entries beyond the size limit"""
+    try:
+        # The results are health data, keep them private to the API's user
+        RESULTS_CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(response.model_dump_json())
+        os.replace(tmp_path, cache_path)
+
+        entries = []
+        for entry in os.scandir(RESULTS_CACHE_DIR):
+            if entry.name.endswith(".json"):
+                try:
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+                except OSError:
+                    pass
+        if len(entries) > RESULTS_CACHE_MAX_ENTRIES:
+            entries.sort()
+            for _, path in entries[:len(entries) - RESULTS_CACHE_MAX_ENTRIES]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                shutil.rmtree(get_outputs_dir(Path(path)), ignore_errors=True)
+    except OSError:
+        # The cache is only an optimization
+        pass
+
+
+_PANDAS_TO_NATIVE = {
+    pd.Series: lambda obj: obj.to_dict(),
+    pd.DataFrame: lambda obj: obj.to_dict('records'),
+    np.ndarray: lambda obj: obj.tolist(),
+    dict: lambda obj: {k: convert_pandas_to_native(v) for k, v in obj.items()},
+    list: lambda obj: [convert_pandas_to_native(item) for item in obj],
+    tuple: lambda obj: [convert_pandas_to_native(item) for item in obj],
+}
+
+_NATIVE_TYPES = frozenset((str, int, float, bool, type(None)))
+
+
 def convert_pandas_to_native(obj):
     """Convert pandas objects to native Python types for JSON serialization"""
-    if isinstance(obj, pd.Series):
-        return obj.to_dict()
-    elif isinstance(obj, pd.DataFrame):
-        return obj.to_dict('records')
-    elif isinstance(obj, dict):
-        return {k: convert_pandas_to_native(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_pandas_to_native(item) for item in obj]
-    elif hasattr(obj, 'item'):  # numpy scalars
-        return obj.item()
-    else:
+    t = type(obj)
+    convert = _PANDAS_TO_NATIVE.get(t)
+    if convert is not None:
+        return convert(obj)
+    if t in _NATIVE_TYPES:
         return obj
+    # Subclasses of the above
+    for cls, convert in _PANDAS_TO_NATIVE.items():
+        if isinstance(obj, cls):
+            return convert(obj)
+    # Numpy scalars
+    if hasattr(obj, 'item'):
+        return obj.item()
+    return obj
+
+
+@njit(parallel=True, cache=True)
+def fused_enmo_minutely(t_ns, x, y, z, steps_t_ns, steps, start_ns, n_minutes, n_threads):
+    """
+    Compute ENMO and reduce it, together with the step counts, into minute bins in a single pass.
+
+    Each of the `n_threads` threads accumulates a contiguous chunk of samples into its
+    own bins, which are summed at the end. The step counts are binned at their own (window)
+    timestamps `steps_t_ns`. NaN values and samples outside of the `n_minutes` bins are
+    skipped, like pandas' resample().sum() and .mean().
+
+    Returns:
+    - tuple: Per-minute step sums, ENMO sums and ENMO counts.
+    """
+    n = len(t_ns)
+    n_chunks = max(1, min(n_threads, n))
+    chunk_len = (n + n_chunks - 1) // n_chunks
+
+    enmo_sum = np.zeros((n_chunks, n_minutes))
+    enmo_cnt = np.zeros((n_chunks, n_minutes), dtype=np.int64)
+
+    for c in prange(n_chunks):
+        for i in range(c * chunk_len, min(n, (c + 1) * chunk_len)):
+            b = (t_ns[i] - start_ns) // MINUTE_NS
+            v = np.sqrt(x[i] * x[i] + y[i] * y[i] + z[i] * z[i]) - 1.0
+            if 0 <= b < n_minutes and not np.isnan(v):
+                enmo_sum[c, b] += v
+                enmo_cnt[c, b] += 1
+
+    # There is only one step count per window, far fewer than samples
+    steps_sum = np.zeros(n_minutes)
+    for i in range(len(steps_t_ns)):
+        b = (steps_t_ns[i] - start_ns) // MINUTE_NS
+        if 0 <= b < n_minutes and not np.isnan(steps[i]):
+            steps_sum[b] += steps[i]
+
+    return steps_sum, enmo_sum.sum(axis=0), enmo_cnt.sum(axis=0)
+
+
+def read_csv_file(csv_path: Path, txyz: str) -> pd.DataFrame:
+    """Read CSV data, parsing the txyz columns with explicit dtypes when possible"""
+    usecols = txyz.split(',')
+    if len(usecols) == 4:
+        try:
+            # The time column is read as text and parsed by process_csv_data, as with the
+            # default parser: pyarrow's own timestamp parsing converts offsets to UTC and keeps
+            # whole-second timestamps in seconds rather than nanoseconds. pandas' pyarrow
+            # engine would still parse them before converting to str, so pyarrow is used directly.
+            csv_data = pa_csv.read_csv(
+                csv_path,
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=usecols,
+                    column_types={usecols[0]: pa.string(), **{col: pa.float32() for col in usecols[1:]}},
+                    strings_can_be_null=True
+                )
+            ).to_pandas()
+        except Exception:
+            # Missing columns or non-numeric values: fall back to the default parser
+            # so that process_csv_data can report exactly what is wrong
+            pass
+        else:
+            try:
+                # Numeric (e.g. epoch) timestamps, which the default parser reads as numbers.
+                # Text timestamps fail on their first value.
+                csv_data[usecols[0]] = pd.to_numeric(csv_data[usecols[0]])
+            except (ValueError, TypeError):
+                pass
+            return csv_data
+    return pd.read_csv(csv_path, memory_map=True)
+
+
+def release_memory(pytorch_device: str = "cpu"):
+    """Hand memory freed by a request back to the OS so that worker RSS doesn't ratchet up"""
+    gc.collect()
+    if pytorch_device.startswith('cuda') and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    if sys.platform.startswith('linux'):
+        try:
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
 
 
 def process_csv_data(
@@ -105,7 +506,30 @@ def process_csv_data(
     output_dir: Path
 ) -> Dict[str, Any]:
     """Process CSV data and return results"""
-    
+    try:
+        return _process_csv_data(csv_data, request, output_dir)
+    finally:
+        # The request's frames are out of scope by now
+        release_memory(request.pytorch_device)
+
+
+def process_csv_file(
+    csv_path: Path,
+    request: ProcessingRequest,
+    output_dir: Path
+) -> Dict[str, Any]:
+    """Read and process a CSV file, so that the data doesn't have to be sent to the process pool"""
+    try:
+        return _process_csv_data(read_csv_file(csv_path, request.txyz), request, output_dir)
+    finally:
+        release_memory(request.pytorch_device)
+
+
+def _process_csv_data(
+    csv_data: pd.DataFrame,
+    request: ProcessingRequest,
+    output_dir: Path
+) -> Dict[str, Any]:
     # Parse column names
     usecols = request.txyz.split(',')
     if len(usecols) != 4:
@@ -116,49 +540,53 @@ def process_csv_data(
     if missing_cols:
         raise KeyError(f"Missing columns: {', '.join(missing_cols)}. Available columns: {', '.join(csv_data.columns)}")
     
-    # Rename columns to standard format
-    csv_data = csv_data.rename(columns={
-        usecols[0]: 'time',
-        usecols[1]: 'x', 
-        usecols[2]: 'y',
-        usecols[3]: 'z'
-    })
+    # Rename columns to standard format, unless they already are (the default) since renaming copies the data
+    if tuple(usecols) != STANDARD_COLUMNS:
+        csv_data = csv_data.rename(columns={
+            usecols[0]: 'time',
+            usecols[1]: 'x', 
+            usecols[2]: 'y',
+            usecols[3]: 'z'
+        })
     
-    # Validate data types for x, y, z columns
-    non_numeric_issues = []
-    for col in ['x', 'y', 'z']:
-        if not pd.api.types.is_numeric_dtype(csv_data[col]):
-            try:
-                # Try to convert to numeric, keeping track of which values fail
-                original_values = csv_data[col].copy()
-                csv_data[col] = pd.to_numeric(csv_data[col], errors='coerce')
-                
-                # Find which specific values couldn't be converted (excluding header if it was treated as data)
-                failed_mask = csv_data[col].isnull() & original_values.notna()
-                if failed_mask.any():
-                    failed_indices = csv_data[failed_mask].index.tolist()[:5]  # Limit to first 5
-                    failed_values = [str(original_values.loc[idx]) for idx in failed_indices]
-                    # Adjust row numbers to be 1-based for user display (add 1 to account for 0-based indexing)
-                    user_friendly_indices = [idx + 1 for idx in failed_indices]
-                    non_numeric_issues.append(f"Column '{col}' has non-numeric values at rows {user_friendly_indices}: {failed_values}")
-            except Exception as e:
-                non_numeric_issues.append(f"Column '{col}' conversion failed: {str(e)}")
-    
-    if non_numeric_issues:
-        error_msg = "Data type validation failed:\n" + "\n".join(non_numeric_issues)
-        error_msg += "\nPlease ensure all accelerometer columns contain only numbers."
-        raise ValueError(error_msg)
+    # Validate x, y, z in a single vectorized pass: any value that is missing or
+    # could not be converted to a number shows up as NaN
+    xyz_cols = ['x', 'y', 'z']
+    non_numeric_cols = [col for col in xyz_cols if not pd.api.types.is_numeric_dtype(csv_data[col])]
+    # Usually empty, the pyarrow parser already reads x, y, z as float32
+    original_values = {}
+    if non_numeric_cols:
+        original_values = csv_data[non_numeric_cols].copy()
+        csv_data[non_numeric_cols] = original_values.apply(pd.to_numeric, errors='coerce')
     
-    # Check for missing values in accelerometer data
-    missing_issues = []
-    for col in ['x', 'y', 'z']:
-        if csv_data[col].isnull().any():
-            null_indices = csv_data[csv_data[col].isnull()].index.tolist()[:5]  # Limit to first 5
-            # Convert to 1-based row numbers for user display
-            user_friendly_indices = [idx + 1 for idx in null_indices]
-            missing_issues.append(f"Column '{col}' has missing values at rows: {user_friendly_indices}")
+    xyz = csv_data[xyz_cols].to_numpy(dtype=np.float32, na_value=np.nan)
+    nan_mask = np.isnan(xyz)
+    bad_cols = nan_mask.any(axis=0)
     
-    if missing_issues:
+    if bad_cols.any():
+        non_numeric_issues = []
+        missing_issues = []
+        for j in np.flatnonzero(bad_cols):
+            col = xyz_cols[j]
+            failed_mask = nan_mask[:, j]
+            if col in original_values:
+                non_numeric_mask = failed_mask & original_values[col].notna().to_numpy()
+            else:
+                non_numeric_mask = np.zeros_like(failed_mask)
+            if non_numeric_mask.any():
+                failed_rows = np.flatnonzero(non_numeric_mask)[:5]  # Limit to first 5
+                failed_values = [str(v) for v in original_values[col].iloc[failed_rows]]
+                # Convert to 1-based row numbers for user display
+                non_numeric_issues.append(f"Column '{col}' has non-numeric values at rows {(failed_rows + 1).tolist()}: {failed_values}")
+            else:
+                null_rows = np.flatnonzero(failed_mask)[:5]  # Limit to first 5
+                missing_issues.append(f"Column '{col}' has missing values at rows: {(null_rows + 1).tolist()}")
+        
+        if non_numeric_issues:
+            error_msg = "Data type validation failed:\n" + "\n".join(non_numeric_issues)
+            error_msg += "\nPlease ensure all accelerometer columns contain only numbers."
+            raise ValueError(error_msg)
+        
         error_msg = "Missing data found:\n" + "\n".join(missing_issues)
         error_msg += "\nPlease ensure all x, y, z values are present."
         raise ValueError(error_msg)
@@ -193,8 +621,10 @@ def process_csv_data(
         user_friendly_indices = [idx + 1 for idx in null_indices]
         raise ValueError(f"Time column contains missing values at rows: {user_friendly_indices}. Please ensure all timestamps are present.")
     
-    # Set time as index
+    # Set time as index, in time order (sample rate inference and minute binning rely on it)
     csv_data = csv_data.set_index('time')
+    if not csv_data.index.is_monotonic_increasing:
+        csv_data = csv_data.sort_index(kind='stable')
     
     # Apply time filtering if specified
     if request.start_time and request.start_time.strip() and request.start_time.lower() != 'string':
@@ -230,30 +660,19 @@ def process_csv_data(
                 raise ValueError(f"Unreasonable sample rate: {sample_rate}")
                 
         except Exception as e:
-            # If sample rate inference fails, calculate manually
-            if len(csv_data) > 1:
-                time_diffs = csv_data.index.to_series().diff().dropna()
-                if len(time_diffs) > 0:
-                    # Use median to avoid outliers
-                    median_diff = time_diffs.median()
-                    if pd.notna(median_diff):
-                        sample_rate = 1.0 / median_diff.total_seconds()
-                        # Validate the calculated sample rate
-                        if sample_rate < 1 or sample_rate > 1000:
-                            # If still unreasonable, try mean
-                            mean_diff = time_diffs.mean()
-                            if pd.notna(mean_diff):
-                                sample_rate = 1.0 / mean_diff.total_seconds()
-                            else:
-                                sample_rate = 104  # Default for your data
-                        else:
-                            sample_rate = 104  # Default for your data
-                    else:
-                        sample_rate = 104  # Default for your data
+            # If sample rate inference fails, calculate manually from the int64 nanosecond timestamps
+            sample_rate = 104  # Default for your data
+            ns = csv_data.index.asi8
+            if ns.size > 1:
+                # Use median to avoid outliers
+                median_ns = np.median(np.diff(ns))
+                if median_ns > 0 and 1 <= 1e9 / median_ns <= 1000:
+                    sample_rate = float(1e9 / median_ns)
                 else:
-                    sample_rate = 104  # Default for your data
-            else:
-                sample_rate = 104  # Default for your data
+                    # If still unreasonable, try mean
+                    mean_ns = (ns[-1] - ns[0]) / (ns.size - 1)
+                    if mean_ns > 0:
+                        sample_rate = float(1e9 / mean_ns)
     else:
         sample_rate = request.sample_rate
     
@@ -292,14 +711,17 @@ def process_csv_data(
     if request.exclude_first_last and request.exclude_first_last.strip() and request.exclude_first_last.lower() != 'string':
         csv_data = utils.drop_first_last_days(csv_data, request.exclude_first_last)
     
+    wear_below_flagged = False
     if request.exclude_wear_below and request.exclude_wear_below.strip() and request.exclude_wear_below.lower() != 'string':
         csv_data = utils.flag_wear_below_days(csv_data, request.exclude_wear_below)
+        wear_below_flagged = True
     
     # Update wear stats after exclusions
     wear_stats.update(utils.calculate_wear_stats(csv_data))
     
-    # Check if we have data to process
-    if len(csv_data) == 0 or csv_data[['x', 'y', 'z']].isna().any(axis=1).all():
+    # Check if we have data to process. x, y and z were validated above, so they can only
+    # be all missing if every day was flagged (flagging blanks whole rows, checking x is enough).
+    if len(csv_data) == 0 or (wear_below_flagged and not csv_data['x'].notna().any()):
         return {
             "error": "No valid data to process after filtering",
             "wear_stats": wear_stats
@@ -381,61 +803,40 @@ def process_csv_data(
         model.window_len = int(model.window_len)
         model.wd.sample_rate = float(sample_rate)
         
-        Y, W, T_steps = model.predict_from_frame(csv_data)
+        device_type = 'cuda' if request.pytorch_device.startswith('cuda') else 'cpu'
+        with torch.inference_mode(), torch.autocast(
+            device_type,
+            dtype=torch.float16 if device_type == 'cuda' else torch.bfloat16,
+            enabled=SSL_AUTOCAST and request.model_type == 'ssl'
+        ):
+            Y, W, T_steps = model.predict_from_frame(csv_data)
     except Exception as e:
         raise ValueError(f"Model prediction failed: {str(e)}. This might be due to insufficient data or incompatible data format.")
     
     # Save step counts
-    Y.to_csv(output_dir / "Steps.csv.gz")
-    T_steps.to_csv(output_dir / "StepTimes.csv.gz", index=False)
-    
-    # Calculate summaries
-    enmo_summary = summarize_enmo(
-        csv_data,
-        adjust_estimates=False,
-        min_wear_per_day=request.min_wear_per_day,
-        min_wear_per_hour=request.min_wear_per_hour,
-        min_wear_per_minute=request.min_wear_per_minute
-    )
+    Y.to_frame().to_parquet(output_dir / "Steps.parquet", engine='pyarrow', compression='zstd')
+    T_steps.to_frame().to_parquet(output_dir / "StepTimes.parquet", engine='pyarrow', compression='zstd', index=False)
     
-    enmo_summary_adj = summarize_enmo(
+    # Calculate summaries, the unadjusted and adjusted variants share their intermediates
+    enmo_summary, enmo_summary_adj = summarize_enmo_both(
         csv_data,
-        adjust_estimates=True,
-        min_wear_per_day=request.min_wear_per_day,
-        min_wear_per_hour=request.min_wear_per_hour,
-        min_wear_per_minute=request.min_wear_per_minute
-    )
-    
-    steps_summary = summarize_steps(
-        Y,
-        model.steptol,
-        adjust_estimates=False,
         min_wear_per_day=request.min_wear_per_day,
         min_wear_per_hour=request.min_wear_per_hour,
         min_wear_per_minute=request.min_wear_per_minute
     )
     
-    steps_summary_adj = summarize_steps(
+    steps_summary, steps_summary_adj = summarize_steps_both(
         Y,
         model.steptol,
-        adjust_estimates=True,
         min_wear_per_day=request.min_wear_per_day,
         min_wear_per_hour=request.min_wear_per_hour,
         min_wear_per_minute=request.min_wear_per_minute
     )
     
-    cadence_summary = summarize_cadence(
-        Y,
-        model.steptol,
-        min_walk_per_day=request.min_walk_per_day,
-        adjust_estimates=False
-    )
-    
-    cadence_summary_adj = summarize_cadence(
+    cadence_summary, cadence_summary_adj = summarize_cadence_both(
         Y,
         model.steptol,
-        min_walk_per_day=request.min_walk_per_day,
-        adjust_estimates=True
+        min_walk_per_day=request.min_walk_per_day
     )
     
     bouts_summary = summarize_bouts(
@@ -447,32 +848,46 @@ def process_csv_data(
     )
     
     # Create minutely, hourly, and daily summaries
-    minutely_data = csv_data.copy()
-    minutely_data['Steps'] = Y
-    minutely_data['ENMO(mg)'] = np.sqrt(csv_data['x']**2 + csv_data['y']**2 + csv_data['z']**2) - 1
-    minutely_data = minutely_data.resample('1T').agg({
-        'Steps': 'sum',
-        'ENMO(mg)': 'mean'
-    }).fillna(0)
-    minutely_data.to_csv(output_dir / "Minutely.csv.gz")
-    
-    hourly_data = minutely_data.resample('1H').agg({
-        'Steps': 'sum',
-        'ENMO(mg)': 'mean'
-    })
-    hourly_data.to_csv(output_dir / "Hourly.csv.gz")
+    t_ns = csv_data.index.asi8
+    minutely_start = csv_data.index[0].floor('T')
+    n_minutes = int((t_ns[-1] - minutely_start.value) // MINUTE_NS) + 1
+    steps_sum, enmo_sum, enmo_cnt = fused_enmo_minutely(
+        t_ns,
+        csv_data['x'].to_numpy(),
+        csv_data['y'].to_numpy(),
+        csv_data['z'].to_numpy(),
+        Y.index.asi8,
+        Y.to_numpy(dtype=np.float64),
+        minutely_start.value,
+        n_minutes,
+        get_num_threads()
+    )
+    with np.errstate(invalid='ignore', divide='ignore'):
+        enmo_mean = enmo_sum / enmo_cnt
+    minutely_data = pd.DataFrame(
+        {'Steps': steps_sum, 'ENMO(mg)': enmo_mean},
+        index=pd.date_range(minutely_start, periods=n_minutes, freq='T', name=csv_data.index.name)
+    ).fillna(0)
+    minutely_data.to_parquet(output_dir / "Minutely.parquet", engine='pyarrow', compression='zstd')
     
-    daily_data = minutely_data.resample('1D').agg({
-        'Steps': 'sum',
-        'ENMO(mg)': 'mean'
+    # Hourly and daily means are carried as sums and counts so that the daily
+    # values can be reduced from the (60x smaller) hourly ones
+    hourly_groups = minutely_data.groupby(minutely_data.index.floor('H'))
+    hourly_sums = hourly_groups.sum()
+    hourly_counts = hourly_groups['ENMO(mg)'].count()
+    hourly_data = pd.DataFrame({
+        'Steps': hourly_sums['Steps'],
+        'ENMO(mg)': hourly_sums['ENMO(mg)'] / hourly_counts
     })
-    daily_data.to_csv(output_dir / "Daily.csv.gz")
+    hourly_data.to_parquet(output_dir / "Hourly.parquet", engine='pyarrow', compression='zstd')
     
-    # Generate plot
-    plot_path = output_dir / "Steps.png"
-    plot(Y, title="Step Count Analysis")
-    plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-    plt.close()
+    daily_sums = hourly_sums.groupby(hourly_sums.index.floor('D')).sum()
+    daily_counts = hourly_counts.groupby(hourly_counts.index.floor('D')).sum()
+    daily_data = pd.DataFrame({
+        'Steps': daily_sums['Steps'],
+        'ENMO(mg)': daily_sums['ENMO(mg)'] / daily_counts
+    })
+    daily_data.to_parquet(output_dir / "Daily.parquet", engine='pyarrow', compression='zstd')
     
     # Compile results
     results = {
@@ -494,24 +909,86 @@ def process_csv_data(
     return results
 
 
+def share_models():
+    """
+    Decompress the preloaded models once so that workers don't each decompress the LZMA originals.
+    Run before the workers are started (gunicorn's on_starting hook, __main__): this takes tens of
+    seconds, longer than a worker may take to boot.
+    """
+    for model_type in PRELOAD_MODELS:
+        try:
+            with model_share_lock(model_type):
+                share_model(model_type)
+                if ONNX_RF and model_type == 'rf':
+                    try:
+                        share_onnx_classifier(model_type)
+                    except Exception as e:
+                        # ONNX Runtime is only an optimization, fall back to scikit-learn
+                        print(f"ONNX export of the {model_type} model failed: {e}")
+        except OSError as e:
+            # The decompressed copy is only an optimization, workers load the original model instead
+            print(f"Sharing the {model_type} model failed: {e}")
+    # The models loaded for the export aren't needed by the parent process
+    release_memory()
+
+
+def render_plot(outputs_dir: Path):
+    """Plot the step counts written to the outputs directory by process_csv_data"""
+    plot_path = outputs_dir / "Steps.png"
+    Y = pd.read_parquet(outputs_dir / "Steps.parquet", engine='pyarrow')['Steps']
+    # plot() already applies tight_layout, no need for the extra render pass of bbox_inches='tight'
+    fig = plot(Y, title="Step Count Analysis")
+    # Written atomically, the file is listed in the response before it is rendered
+    tmp_path = plot_path.with_name(f"{plot_path.name}.{os.getpid()}.tmp")
+    fig.savefig(tmp_path, dpi=100, format='png')
+    plt.close(fig)
+    os.replace(tmp_path, plot_path)
+
+
+async def finalize_outputs(temp_dir: str, outputs_dir: Optional[Path]):
+    """Once the response has been sent, remove the upload and render the plot"""
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    if outputs_dir is not None and not (outputs_dir / "Steps.png").exists():
+        try:
+            await run_in_process_pool(render_plot, outputs_dir)
+        except Exception as e:
+            print(f"Rendering the plot in {outputs_dir} failed: {e}")
+
+
+@app.on_event("startup")
+def start_process_pool():
+    # Created per worker process, never in a pre-fork parent, so that workers don't share its queues
+    app.state.process_pool = make_process_pool()
+
+
+@app.on_event("shutdown")
+def stop_process_pool():
+    app.state.process_pool.shutdown(cancel_futures=True)
+
+
+# Constant payloads, encoded once
+ROOT_RESPONSE = orjson.dumps({
+    "message": "StepCount API",
+    "version": __version__,
+    "docs": "/docs",
+    "endpoints": {
+        "upload_csv": "/upload-csv",
+        "health": "/health"
+    }
+})
+HEALTH_RESPONSE = orjson.dumps({"status": "healthy", "version": __version__})
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
-    return {
-        "message": "StepCount API",
-        "version": __version__,
-        "docs": "/docs",
-        "endpoints": {
-            "upload_csv": "/upload-csv",
-            "health": "/health"
-        }
-    }
+    return Response(content=ROOT_RESPONSE, media_type="application/json")
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "version": __version__}
+    return Response(content=HEALTH_RESPONSE, media_type="application/json")
 
 
 @app.post("/upload-csv", response_model=ProcessingResponse)
@@ -564,40 +1041,71 @@ async def upload_csv(
             pytorch_device=pytorch_device or "cpu"
         )
         
-        # Read CSV data
-        content = await file.read()
-        csv_data = pd.read_csv(io.BytesIO(content))
-        
-        # Create temporary output directory
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_dir = Path(temp_dir) / "outputs"
-            output_dir.mkdir(parents=True, exist_ok=True)
+        # Create temporary directory for the upload, removed by a background task after the response is sent
+        temp_dir = tempfile.mkdtemp()
+        outputs_dir = None
+        try:
+            # Stream the upload to disk in chunks rather than loading it all in memory.
+            # The content is hashed along the way to look up previously computed results.
+            csv_path = Path(temp_dir) / "upload.csv"
+            content_hash = blake3.blake3()
+            with open(csv_path, 'wb') as f:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    content_hash.update(chunk)
+                    f.write(chunk)
             
-            # Process data
-            results = process_csv_data(csv_data, request, output_dir)
+            cache_path = get_results_cache_path(content_hash.hexdigest(), request)
+            cached_response = await run_in_threadpool(load_cached_response, cache_path)
+            if cached_response is not None and get_outputs_dir(cache_path).is_dir():
+                # Renders the plot again if that failed the first time
+                outputs_dir = get_outputs_dir(cache_path)
+                return cached_response.model_copy(update={"processing_time": time.time() - start_time_processing})
             
-            if "error" in results:
-                return ProcessingResponse(
-                    success=False,
-                    message=results["error"],
-                    processing_time=time.time() - start_time_processing
-                )
+            # The outputs are kept with the cached results. They are written to a private
+            # directory next to their final one, and moved into place once complete.
+            OUTPUTS_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+            output_dir = Path(tempfile.mkdtemp(dir=OUTPUTS_DIR, prefix=f"{cache_path.stem}.", suffix=".tmp"))
+            try:
+                # Read and process the data in the process pool so the event loop stays responsive.
+                # The worker reads the file itself rather than being sent the parsed data.
+                results = await run_in_process_pool(process_csv_file, csv_path, request, output_dir)
+                
+                if "error" in results:
+                    return ProcessingResponse(
+                        success=False,
+                        message=results["error"],
+                        processing_time=time.time() - start_time_processing
+                    )
+                
+                try:
+                    os.rename(output_dir, get_outputs_dir(cache_path))
+                except OSError:
+                    # Already produced by an identical upload
+                    pass
+            finally:
+                shutil.rmtree(output_dir, ignore_errors=True)
+            outputs_dir = get_outputs_dir(cache_path)
             
-            # Create output files dictionary
+            # Create output files dictionary, the plot is rendered in the background
             output_files = {}
-            for file_path in output_dir.glob("*"):
+            for file_path in outputs_dir.glob("*"):
                 if file_path.is_file():
                     output_files[file_path.name] = str(file_path)
+            output_files["Steps.png"] = str(outputs_dir / "Steps.png")
             
             processing_time = time.time() - start_time_processing
             
-            return ProcessingResponse(
+            response = ProcessingResponse(
                 success=True,
                 message="Processing completed successfully",
                 processing_time=processing_time,
                 results=results,
                 output_files=output_files
             )
+            await run_in_threadpool(store_cached_response, cache_path, response)
+            return response
+        finally:
+            background_tasks.add_task(finalize_outputs, temp_dir, outputs_dir)
     
     except ValueError as e:
         error_msg = str(e)
@@ -664,8 +1172,8 @@ async def process_data(
             output_dir = Path(temp_dir) / "outputs"
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            # Process data
-            results = process_csv_data(csv_data, request, output_dir)
+            # Process data in the process pool so the event loop stays responsive
+            results = await run_in_process_pool(process_csv_data, csv_data, request, output_dir)
             
             if "error" in results:
                 return ProcessingResponse(
@@ -694,6 +1202,8 @@ async def process_data(
 
 # Patient management models
 class Patient(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: str
     nom: str
     prenom: str
@@ -704,18 +1214,43 @@ class Patient(BaseModel):
     taille: float
 
 class AccelerometerConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: str
     patient_id: str
     status: str = "configured"
     created_at: str
 
 class ExtractionData(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     fileSize: int
     lineCount: int
     data: str
 
+# Patient IDs are short alphanumeric codes, handlers answer anything else with a 400
+# before looking it up
+is_valid_patient_id: Final = re.compile(r"[A-Za-z0-9_-]{1,64}").fullmatch
+is_valid_accelerometer_id: Final = re.compile(r"ACC_[A-Za-z0-9_-]{1,96}").fullmatch
+
+class AccelerometerConfigureRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
+    patient_id: str = Field(min_length=1)
+
+class AccelerometerExtractRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
+    accelerometer_id: str = Field(min_length=1)
+
+class PatientProcessRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
+    patient_id: str = Field(min_length=1)
+    extraction_data: Dict[str, Any] = Field(min_length=1)
+
 # Mock database for patients (in production, use a real database)
-patients_db = {
+_patients = {
     "P001": {
         "id": "P001",
         "nom": "Dupont",
@@ -747,82 +1282,221 @@ patients_db = {
         "taille": 180.0
     }
 }
+# Read-only, the Patient models are built once at import
+patients_db: Final[Mapping[str, Patient]] = MappingProxyType({
+    sys.intern(patient_id): Patient(**patient) for patient_id, patient in _patients.items()
+})
+
+# Accelerometer configurations are stored in SQLite so that all API workers share them
+STATE_DB_PATH: Final = Path(os.environ.get(
+    "STEPCOUNT_STATE_DB",
+    Path(tempfile.gettempdir()) / "stepcount-state.db"
+))
+
+STATE_DB_MMAP_SIZE: Final = 64 << 20
+
+_state_db = threading.local()
+
+class AccelerometerRecord(NamedTuple):
+    """Row of the accelerometers table"""
+    id: str
+    patient_id: str
+    status: str
+    created_at: str
+
+def get_state_db() -> sqlite3.Connection:
+    """Connection to the state database, one per thread and opened lazily so that it isn't shared across forks"""
+    conn = getattr(_state_db, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(STATE_DB_PATH, isolation_level=None, timeout=10)
+        # WAL lets readers in other workers proceed while one of them writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Read through a shared mapping of the database file, so workers look
+        # rows up in the same page cache pages without read() copies
+        conn.execute(f"PRAGMA mmap_size={STATE_DB_MMAP_SIZE}")
+        # Rows are clustered on their ID, a lookup is a single B-tree search
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS accelerometers ("
+            "id TEXT PRIMARY KEY, patient_id TEXT NOT NULL, status TEXT NOT NULL, created_at TEXT NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        _state_db.conn = conn
+    return conn
+
+# Extracted accelerometer recordings are kept on disk and served with sendfile
+EXTRACTION_DIR: Final = Path(os.environ.get(
+    "STEPCOUNT_EXTRACTION_DIR",
+    Path(tempfile.gettempdir()) / "stepcount-extractions"
+))
+
+def get_extraction_path(accelerometer_id: str) -> Path:
+    """Path of the extracted CSV recording of an accelerometer"""
+    return EXTRACTION_DIR / f"{accelerometer_id}.csv"
+
+# Mock recording written by the simulated extraction
+MOCK_EXTRACTION_CSV: Final = b"time,x,y,z\n2025-01-01 10:00:00,0.5,-0.8,0.1\n"
+
+# Mock extraction payload, encoded once
+EXTRACTION_RESPONSE: Final = orjson.dumps({
+    "fileSize": 1024000,  # 1MB
+    "lineCount": 50000,
+    "data": "time,x,y,z\n2025-01-01 10:00:00,0.5,-0.8,0.1\n...",
+    "message": "Data extracted successfully"
+})
+
+# Constant accelerometer status and message strings, interned once
+_STATUS_CONFIGURED: Final = sys.intern("configured")
+_CONFIGURE_MSG: Final = sys.intern("Accelerometer configured and initialized successfully")
 
-accelerometers_db = {}
+# Accelerometer ID sequence, seeded from the clock and reseeded in forked workers
+_acc_counter = itertools.count(time.time_ns())
+
+def _reseed_acc_counter() -> None:
+    global _acc_counter
+    _acc_counter = itertools.count(time.time_ns())
+
+os.register_at_fork(after_in_child=_reseed_acc_counter)
+
+def next_accelerometer_id(patient_id: str) -> str:
+    """Unique accelerometer ID with a base32 encoded 64-bit sequence number"""
+    suffix = base64.b32encode(next(_acc_counter).to_bytes(8, "big")).rstrip(b"=").decode()
+    return "ACC_" + patient_id + "_" + suffix
+
+@lru_cache(maxsize=1)
+def format_timestamp(seconds: int) -> str:
+    """Format a Unix time in local time, requests within the same second share the result"""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(seconds))
+
+# Constant error responses, built once; re-raised without their previous
+# traceback so it doesn't accumulate frames
+PATIENT_NOT_FOUND: Final = HTTPException(status_code=404, detail="Patient not found")
+ACCELEROMETER_NOT_FOUND: Final = HTTPException(status_code=404, detail="Accelerometer not found")
+EXTRACTION_NOT_FOUND: Final = HTTPException(status_code=404, detail="Extracted data not found")
+INVALID_PATIENT_ID: Final = HTTPException(status_code=400, detail="Invalid patient ID")
+INVALID_ACCELEROMETER_ID: Final = HTTPException(status_code=400, detail="Invalid accelerometer ID")
 
 # Patient management endpoints
 @app.get("/patients/{patient_id}")
-async def get_patient(patient_id: str):
+def get_patient(patient_id: str, if_none_match: Optional[str] = Header(None)) -> Response:
     """Get patient information by ID"""
+    if not is_valid_patient_id(patient_id):
+        raise INVALID_PATIENT_ID.with_traceback(None)
     if patient_id not in patients_db:
-        raise HTTPException(status_code=404, detail="Patient not found")
+        raise PATIENT_NOT_FOUND.with_traceback(None)
     
-    return patients_db[patient_id]
+    content, etag = encode_patient(patient_id)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=content, media_type="application/json", headers={"ETag": etag})
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (RFC 9110): "*" or a list of tags, compared weakly (ignoring W/)"""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+@lru_cache(maxsize=4096)
+def encode_patient(patient_id: str) -> Tuple[bytes, str]:
+    """JSON encoded patient and its ETag, cached as patients_db is read-only"""
+    content = orjson.dumps(patients_db[patient_id].model_dump())
+    return content, f'"{hashlib.blake2b(content, digest_size=8).hexdigest()}"'
 
 @app.post("/accelerometer/configure")
-async def configure_accelerometer(request: dict):
+def configure_accelerometer(request: AccelerometerConfigureRequest):
     """Configure and initialize accelerometer for a patient"""
-    patient_id = request.get("patient_id")
-    
-    if not patient_id:
-        raise HTTPException(status_code=400, detail="Patient ID is required")
+    patient_id = request.patient_id
     
+    if not is_valid_patient_id(patient_id):
+        raise INVALID_PATIENT_ID.with_traceback(None)
     if patient_id not in patients_db:
-        raise HTTPException(status_code=404, detail="Patient not found")
+        raise PATIENT_NOT_FOUND.with_traceback(None)
     
-    # Generate accelerometer ID
-    accelerometer_id = f"ACC_{patient_id}_{int(time.time())}"
+    created_at = format_timestamp(time.time_ns() // 1_000_000_000)
     
-    # Store accelerometer configuration
-    accelerometers_db[accelerometer_id] = {
-        "id": accelerometer_id,
-        "patient_id": patient_id,
-        "status": "configured",
-        "created_at": time.strftime("%Y-%m-%d %H:%M:%S")
-    }
+    # Store accelerometer configuration, drawing a new ID on the rare clash
+    # with another worker's sequence
+    conn = get_state_db()
+    while True:
+        record = AccelerometerRecord(next_accelerometer_id(patient_id), patient_id, _STATUS_CONFIGURED, created_at)
+        try:
+            conn.execute(
+                "INSERT INTO accelerometers (id, patient_id, status, created_at) VALUES (?, ?, ?, ?)",
+                record
+            )
+            break
+        except sqlite3.IntegrityError:
+            continue
     
     return {
-        "id": accelerometer_id,
-        "patient_id": patient_id,
-        "status": "configured",
-        "message": "Accelerometer configured and initialized successfully"
+        "id": record.id,
+        "patient_id": record.patient_id,
+        "status": record.status,
+        "message": _CONFIGURE_MSG
     }
 
 @app.post("/accelerometer/extract")
-async def extract_accelerometer_data(request: dict):
+def extract_accelerometer_data(request: AccelerometerExtractRequest) -> Response:
     """Extract CSV data from accelerometer"""
-    accelerometer_id = request.get("accelerometer_id")
-    
-    if not accelerometer_id:
-        raise HTTPException(status_code=400, detail="Accelerometer ID is required")
+    accelerometer_id = request.accelerometer_id
     
-    if accelerometer_id not in accelerometers_db:
-        raise HTTPException(status_code=404, detail="Accelerometer not found")
+    if not is_valid_accelerometer_id(accelerometer_id):
+        raise INVALID_ACCELEROMETER_ID.with_traceback(None)
+    if get_state_db().execute("SELECT 1 FROM accelerometers WHERE id = ?", (accelerometer_id,)).fetchone() is None:
+        raise ACCELEROMETER_NOT_FOUND.with_traceback(None)
     
     # Simulate data extraction (in production, this would connect to the actual accelerometer)
-    # For demo purposes, we'll return mock data
-    return {
-        "fileSize": 1024000,  # 1MB
-        "lineCount": 50000,
-        "data": "time,x,y,z\n2025-01-01 10:00:00,0.5,-0.8,0.1\n...",
-        "message": "Data extracted successfully"
-    }
+    # For demo purposes, we'll store and return mock data
+    extraction_path = get_extraction_path(accelerometer_id)
+    if not extraction_path.exists():
+        EXTRACTION_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = extraction_path.with_name(f"{extraction_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(MOCK_EXTRACTION_CSV)
+        os.replace(tmp_path, extraction_path)
+    
+    return Response(content=EXTRACTION_RESPONSE, media_type="application/json")
 
-@app.post("/patients/process-data")
-async def process_patient_data(request: dict):
-    """Process extracted data for a patient"""
-    patient_id = request.get("patient_id")
-    extraction_data = request.get("extraction_data")
+@app.get("/accelerometer/{accelerometer_id}/data")
+def download_accelerometer_data(accelerometer_id: str) -> FileResponse:
+    """Download the extracted CSV recording of an accelerometer"""
+    # The ID is part of a file path, it must not contain separators
+    if not is_valid_accelerometer_id(accelerometer_id):
+        raise INVALID_ACCELEROMETER_ID.with_traceback(None)
     
-    if not patient_id:
-        raise HTTPException(status_code=400, detail="Patient ID is required")
+    extraction_path = get_extraction_path(accelerometer_id)
+    if not extraction_path.is_file():
+        raise EXTRACTION_NOT_FOUND.with_traceback(None)
     
-    if not extraction_data:
-        raise HTTPException(status_code=400, detail="Extraction data is required")
+    # Starlette streams the file with sendfile where available
+    return FileResponse(extraction_path, media_type="text/csv", filename=extraction_path.name)
+
+@app.post("/patients/process-data")
+def process_patient_data(request: PatientProcessRequest) -> Response:
+    """Process extracted data for a patient"""
+    patient_id = request.patient_id
     
+    if not is_valid_patient_id(patient_id):
+        raise INVALID_PATIENT_ID.with_traceback(None)
     if patient_id not in patients_db:
-        raise HTTPException(status_code=404, detail="Patient not found")
+        raise PATIENT_NOT_FOUND.with_traceback(None)
     
+    # Identical extractions are processed once, keyed on their canonical JSON
+    try:
+        extraction_json = orjson.dumps(request.extraction_data, option=orjson.OPT_SORT_KEYS)
+    except orjson.JSONEncodeError:
+        # Valid JSON that orjson can't encode, e.g. integers beyond 64 bits
+        extraction_json = json.dumps(request.extraction_data, sort_keys=True).encode()
+    extraction_digest = blake3.blake3(extraction_json).hexdigest()
+    return Response(
+        content=process_extraction(patient_id, extraction_digest),
+        media_type="application/json"
+    )
+
+@lru_cache(maxsize=1024)
+def process_extraction(patient_id: str, extraction_digest: str) -> bytes:
+    """JSON encoded processing results of an extraction, memoized on its content digest"""
     # Simulate data processing (in production, this would use the actual stepcount algorithm)
     # For demo purposes, we'll return mock results
     processing_results = {
@@ -835,16 +1509,28 @@ async def process_patient_data(request: dict):
     }
     
     # In production, save results to database
-    return {
+    return orjson.dumps({
         "patient_id": patient_id,
         "results": processing_results,
         "message": "Data processed and saved successfully"
-    }
+    })
 
 if __name__ == "__main__":
+    # Development server: STEPCOUNT_DEV=1 python -m stepcount.api enables auto-reload
+    # with a single worker. Otherwise as many workers are started as in production
+    # (gunicorn --config gunicorn_conf.py stepcount.api:app), see default_worker_count.
+    reload = os.getenv("STEPCOUNT_DEV") == "1"
+    workers = 1 if reload else int(os.environ.get("WEB_CONCURRENCY", 0)) or default_worker_count()
+    if workers > 1:
+        # As in gunicorn_conf.py, one processing process per worker
+        os.environ.setdefault("STEPCOUNT_PROCESS_WORKERS", "1")
+    share_models()
     uvicorn.run(
         "stepcount.api:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        loop="uvloop",
+        http="httptools",
+        workers=workers,
+        reload=reload
     )
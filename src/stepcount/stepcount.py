@@ -628,6 +628,48 @@ def summarize_enmo(
         summary = summarize_enmo(data, adjust_estimates=True)
     """
 
+    v, dt = _minutely_enmo(data)
+    return _summarize_enmo(v, dt, adjust_estimates, min_wear_per_day, min_wear_per_hour, min_wear_per_minute)
+
+
+def summarize_enmo_both(
+    data: pd.DataFrame,
+    min_wear_per_day: float = 21 * 60,
+    min_wear_per_hour: float = 50,
+    min_wear_per_minute: float = 0.5,
+):
+    """
+    Like `summarize_enmo`, but return both the unadjusted and the adjusted summaries,
+    computing the minutely ENMO only once.
+
+    Returns:
+    - tuple: The summaries with adjust_estimates=False and adjust_estimates=True.
+    """
+
+    v, dt = _minutely_enmo(data)
+    return (
+        _summarize_enmo(v, dt, False, min_wear_per_day, min_wear_per_hour, min_wear_per_minute),
+        _summarize_enmo(v, dt, True, min_wear_per_day, min_wear_per_hour, min_wear_per_minute),
+    )
+
+
+def _minutely_enmo(data: pd.DataFrame):
+    """ Minutely truncated ENMO in mg and its sampling interval in seconds """
+
+    # Truncated ENMO: Euclidean norm minus one and clipped at zero
+    v = np.sqrt(data['x'] ** 2 + data['y'] ** 2 + data['z'] ** 2)
+    v = np.clip(v - 1, a_min=0, a_max=None)
+    v *= 1000  # convert to mg
+    # promptly downsample to minutely to reduce future computation and memory at minimal loss to accuracy
+    v = v.resample('T').mean()
+
+    dt = utils.infer_freq(v.index).total_seconds()
+
+    return v, dt
+
+
+def _summarize_enmo(v, dt, adjust_estimates, min_wear_per_day, min_wear_per_hour, min_wear_per_minute):
+
     def _is_enough(x, min_wear=None, dt=None):
         if min_wear is None:
             return True  # no minimum wear time, then default to True
@@ -640,15 +682,6 @@ def summarize_enmo(
             return np.nan
         return x.mean()
 
-    # Truncated ENMO: Euclidean norm minus one and clipped at zero
-    v = np.sqrt(data['x'] ** 2 + data['y'] ** 2 + data['z'] ** 2)
-    v = np.clip(v - 1, a_min=0, a_max=None)
-    v *= 1000  # convert to mg
-    # promptly downsample to minutely to reduce future computation and memory at minimal loss to accuracy
-    v = v.resample('T').mean()
-
-    dt = utils.infer_freq(v.index).total_seconds()
-
     if adjust_estimates:
         v = utils.impute_missing(v)
 
@@ -716,6 +749,36 @@ def summarize_steps(
         summary = summarize_steps(Y, steptol=3, adjust_estimates=True)
     """
 
+    dt = utils.infer_freq(Y.index).total_seconds()
+    W = Y.mask(~Y.isna(), Y >= steptol).astype('float')
+    return _summarize_steps(Y, W, dt, adjust_estimates, min_wear_per_day, min_wear_per_hour, min_wear_per_minute)
+
+
+def summarize_steps_both(
+    Y: pd.Series,
+    steptol: int = 3,
+    min_wear_per_day: float = 21 * 60,
+    min_wear_per_hour: float = 50,
+    min_wear_per_minute: float = 0.5,
+):
+    """
+    Like `summarize_steps`, but return both the unadjusted and the adjusted summaries,
+    inferring the sampling interval and the walking indicator only once.
+
+    Returns:
+    - tuple: The summaries with adjust_estimates=False and adjust_estimates=True.
+    """
+
+    dt = utils.infer_freq(Y.index).total_seconds()
+    W = Y.mask(~Y.isna(), Y >= steptol).astype('float')
+    return (
+        _summarize_steps(Y, W, dt, False, min_wear_per_day, min_wear_per_hour, min_wear_per_minute),
+        _summarize_steps(Y, W, dt, True, min_wear_per_day, min_wear_per_hour, min_wear_per_minute),
+    )
+
+
+def _summarize_steps(Y, W, dt, adjust_estimates, min_wear_per_day, min_wear_per_hour, min_wear_per_minute):
+
     # there's a bug with .resample().sum(skipna)
     # https://github.com/pandas-dev/pandas/issues/29382
 
@@ -774,9 +837,6 @@ def summarize_steps(
         minutes, seconds = divmod(rem, 60)
         return f"{hours:02}:{minutes:02}:{seconds:02}"
 
-    dt = utils.infer_freq(Y.index).total_seconds()
-    W = Y.mask(~Y.isna(), Y >= steptol).astype('float')
-
     if adjust_estimates:
         Y = utils.impute_missing(Y)
         W = utils.impute_missing(W)
@@ -1006,6 +1066,33 @@ def summarize_cadence(
         summary = summarize_cadence(Y, steptol=3, adjust_estimates=True)
     """
 
+    daily_cadences = _daily_cadences(Y, steptol, min_walk_per_day)
+    return _summarize_cadence(*daily_cadences, adjust_estimates)
+
+
+def summarize_cadence_both(
+    Y: pd.Series,
+    steptol: int = 3,
+    min_walk_per_day: int = 5,
+):
+    """
+    Like `summarize_cadence`, but return both the unadjusted and the adjusted summaries,
+    computing the daily cadences only once.
+
+    Returns:
+    - tuple: The summaries with adjust_estimates=False and adjust_estimates=True.
+    """
+
+    daily_cadences = _daily_cadences(Y, steptol, min_walk_per_day)
+    return (
+        _summarize_cadence(*daily_cadences, False),
+        _summarize_cadence(*daily_cadences, True),
+    )
+
+
+def _daily_cadences(Y, steptol, min_walk_per_day):
+    """ Daily peak 1-min, peak 30-min and 95th percentile cadences """
+
     # TODO: split walking and running cadence?
 
     dt = utils.infer_freq(Y.index).total_seconds()
@@ -1035,6 +1122,11 @@ def summarize_cadence(
     daily_cadence_peak30 = minutely.resample('D').agg(_cadence_max, n=30).rename('CadencePeak30(steps/min)')
     daily_cadence_p95 = minutely.resample('D').agg(_cadence_p95).rename('Cadence95th(steps/min)')
 
+    return daily_cadence_peak1, daily_cadence_peak30, daily_cadence_p95
+
+
+def _summarize_cadence(daily_cadence_peak1, daily_cadence_peak30, daily_cadence_p95, adjust_estimates):
+
     with warnings.catch_warnings():
         warnings.filterwarnings('ignore', message='Mean of empty slice')
 